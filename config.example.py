@@ -1,11 +1,19 @@
 # config.example.py
-from pytz import timezone
+from zoneinfo import ZoneInfo
 
 TOKEN = "PUT_TOKEN_HERE"
 CHAT_ID = -1001234567890
 CSV_FILE = "timetable.csv"
 
-TIMEZONE = timezone("Europe/Moscow")  # поменяй при необходимости
+# Опционально: авто-уведомления в несколько чатов (рассылаются параллельно)
+# CHAT_IDS = [-1001234567890, -1009876543210]
+
+TIMEZONE = ZoneInfo("Europe/Moscow")  # поменяй при необходимости
 
 REMINDER_MORNING_TIME = (7, 30)
 REMINDER_EVENING_TIME = (19, 30)
+
+# Опционально: webhook вместо long-polling (нужен публичный HTTPS-адрес)
+# WEBHOOK_URL = "https://example.com"
+# WEBHOOK_LISTEN = "0.0.0.0"
+# WEBHOOK_PORT = 8443
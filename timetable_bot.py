@@ -7,7 +7,8 @@ Telegram-бот для напоминаний о занятиях из CSV.
 Требования:
 - python-telegram-bot >= 20
 - Установить JobQueue: pip install "python-telegram-bot[job-queue]"
-- pytz
+- orjson (опционально: ускоряет чтение/запись reminders.json)
+- uvloop (опционально: ускоряет event loop, только Linux/macOS)
 
 Настройки вынесены в config.py (не коммитить), пример: config.example.py
 """
@@ -15,15 +16,29 @@ Telegram-бот для напоминаний о занятиях из CSV.
 from __future__ import annotations
 
 import asyncio
+import atexit
 import csv
+import functools
 import json
+import logging
 import os
+import queue
 import re
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta, time as dtime
+from datetime import date, datetime, timedelta, time as dtime
+from logging.handlers import QueueHandler, QueueListener
+from operator import attrgetter
 from typing import Dict, List, Optional, Any
 
-import pytz
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
 from telegram import (
     Update,
     ReplyKeyboardMarkup,
@@ -41,17 +56,26 @@ from telegram.ext import (
 
 import config  # noqa: F401
 
+logger = logging.getLogger(__name__)
+
 
 # ========= НАСТРОЙКИ (из config.py) =========
 TOKEN: str = config.TOKEN
 CHAT_ID: int = config.CHAT_ID
 CSV_FILE: str = config.CSV_FILE
 
-TIMEZONE = config.TIMEZONE  # pytz timezone object
+# Опционально: несколько чатов для авто-уведомлений (по умолчанию один CHAT_ID)
+CHAT_IDS: List[int] = list(getattr(config, "CHAT_IDS", None) or [CHAT_ID])
+
+TIMEZONE = config.TIMEZONE  # zoneinfo.ZoneInfo object
 REMINDER_MORNING_TIME = config.REMINDER_MORNING_TIME  # (7, 30)
 REMINDER_EVENING_TIME = config.REMINDER_EVENING_TIME  # (19, 30)
 
 REMINDERS_FILE = getattr(config, "REMINDERS_FILE", "reminders.json")
+
+# fsync после каждой записи reminders.json. По умолчанию выключено:
+# os.replace уже атомарен, а fsync замедляет запись мелких файлов на порядок.
+REMINDERS_FSYNC = getattr(config, "REMINDERS_FSYNC", False)
 MAX_REMINDERS_PER_USER = getattr(config, "MAX_REMINDERS_PER_USER", 20)
 
 # Если True: /get_timetable БЕЗ даты показывает расписание на следующий учебный день (по CSV),
@@ -61,9 +85,15 @@ NEXT_DAY_MODE_USE_CSV = getattr(config, "NEXT_DAY_MODE_USE_CSV", True)
 # Ограничение поиска "следующего учебного дня" вперед
 MAX_LOOKAHEAD_DAYS = getattr(config, "MAX_LOOKAHEAD_DAYS", 365)
 
+# Если задан WEBHOOK_URL — бот слушает webhook вместо long-polling
+# (Telegram сам пушит апдейты: ниже задержка, нет цикла getUpdates)
+WEBHOOK_URL = getattr(config, "WEBHOOK_URL", None)
+WEBHOOK_LISTEN = getattr(config, "WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = getattr(config, "WEBHOOK_PORT", 8443)
+
 
 # ========= УТИЛИТЫ =========
-DATE_RE = re.compile(r"^\d{2}\.\d{2}\.\d{4}$")
+DATE_RE = re.compile(r"^(\d{2})\.(\d{2})\.(\d{4})$")
 
 
 def now_tz() -> datetime:
@@ -71,15 +101,31 @@ def now_tz() -> datetime:
 
 
 def normalize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s.strip())
+    # быстрый путь: в одно-словных сообщениях нечего схлопывать
+    if " " not in s and "\t" not in s and "\n" not in s:
+        return s.strip()
+    # " ".join(split()) — C-реализация, эквивалент re.sub(r"\s+", " ", ...)
+    return " ".join(s.split())
 
 
+@functools.lru_cache(maxsize=512)
 def parse_date_ddmmyyyy(s: str) -> datetime:
-    return datetime.strptime(s, "%d.%m.%Y")
+    # регулярка + int() заметно быстрее strptime для фиксированного формата
+    m = DATE_RE.match(s)
+    if m is None:
+        raise ValueError(f"Неверный формат даты: {s!r}")
+    d, mo, y = m.groups()
+    return datetime(int(y), int(mo), int(d))
+
+
+@functools.lru_cache(maxsize=512)
+def _format_ordinal_ddmmyyyy(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%d.%m.%Y")
 
 
 def format_date_ddmmyyyy(dt: datetime) -> str:
-    return dt.strftime("%d.%m.%Y")
+    # кэшируем по ordinal даты: tz-aware datetime не нужен для формата
+    return _format_ordinal_ddmmyyyy(dt.toordinal())
 
 
 def is_working_day(dt: datetime) -> bool:
@@ -88,7 +134,15 @@ def is_working_day(dt: datetime) -> bool:
 
 
 # ========= РАСПИСАНИЕ =========
-@dataclass(frozen=True)
+KIND_EMOJI = {
+    'л': '👨‍🏫 Лекция',
+    'пр': '✍️ Практика',
+    'сем': '💬 Семинар',
+    'лаб': '🔬 Лабораторная',
+}
+
+
+@dataclass(frozen=True, slots=True)
 class LessonRow:
     date_str: str
     pair: int
@@ -98,65 +152,147 @@ class LessonRow:
     teachers: str
     room: str
 
-    @staticmethod
-    def from_csv_row(row: Dict[str, str]) -> "LessonRow":
-        def g(key: str) -> str:
-            return (row.get(key) or "").strip()
-
-        pair_s = g("Пара")
-        try:
-            pair_i = int(pair_s)
-        except Exception:
-            pair_i = 0
-
-        return LessonRow(
-            date_str=g("Дата"),
-            pair=pair_i,
-            discipline=g("Дисциплина"),
-            theme=g("Номер темы"),
-            kind=g("Вид занятия"),
-            teachers=g("Преподаватели"),
-            room=g("Ауд."),
-        )
-
 
 class Timetable:
     def __init__(self, csv_file: str):
         self.csv_file = csv_file
-        self.by_date: Dict[str, List[LessonRow]] = {}
+        self.by_date: Dict[date, List[LessonRow]] = {}
+        self._sorted_study_dates: List[date] = []
+        self._self_study_days: set[date] = set()
+        self._formatted_cache: Dict[str, str] = {}
+        self._mtime_ns = 0
         self.load_csv()
 
     def load_csv(self) -> None:
         if not os.path.exists(self.csv_file):
             raise FileNotFoundError(f"CSV file not found: {self.csv_file}")
 
+        mtime_ns = os.stat(self.csv_file).st_mtime_ns
+
         with open(self.csv_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f, delimiter=";")
-            by_date: Dict[str, List[LessonRow]] = {}
+            reader = csv.reader(f, delimiter=";")
+            header = next(reader, None) or []
+            idx = {name.strip(): i for i, name in enumerate(header)}
+            i_date = idx.get("Дата", 0)
+            i_pair = idx.get("Пара", 1)
+            i_disc = idx.get("Дисциплина", 2)
+            i_theme = idx.get("Номер темы", 3)
+            i_kind = idx.get("Вид занятия", 4)
+            i_teachers = idx.get("Преподаватели", 5)
+            i_room = idx.get("Ауд.", 6)
+            n_cols = len(header)
+
+            by_date: Dict[date, List[LessonRow]] = defaultdict(list)
+            last_pair: Dict[date, int] = {}
+            unsorted_dates: set[date] = set()
             for row in reader:
-                lr = LessonRow.from_csv_row(row)
-                if not lr.date_str:
+                if len(row) < n_cols:
+                    # дополняем на месте: csv.reader отдаёт свежий список
+                    row.extend([""] * (n_cols - len(row)))
+
+                date_str = row[i_date].strip()
+                if not date_str:
                     continue
-                by_date.setdefault(lr.date_str, []).append(lr)
 
-        # сортировка по номеру пары
-        for d, rows in by_date.items():
-            by_date[d] = sorted(rows, key=lambda x: x.pair)
+                # ключ индекса — date: дешёвый hash вместо strftime на каждый запрос
+                try:
+                    date_key = parse_date_ddmmyyyy(date_str).date()
+                except ValueError:
+                    logger.warning("Некорректная дата в CSV пропущена: %r", date_str)
+                    continue
 
-        self.by_date = by_date
+                try:
+                    pair_i = int(row[i_pair])
+                except Exception:
+                    pair_i = 0
+
+                lr = LessonRow(
+                    date_str=date_str,
+                    pair=pair_i,
+                    discipline=row[i_disc].strip(),
+                    theme=row[i_theme].strip(),
+                    kind=row[i_kind].strip(),
+                    teachers=row[i_teachers].strip(),
+                    room=row[i_room].strip(),
+                )
+                prev = last_pair.get(date_key)
+                if prev is not None and pair_i < prev:
+                    unsorted_dates.add(date_key)
+                last_pair[date_key] = pair_i
+                by_date[date_key].append(lr)
+
+        # CSV обычно уже упорядочен по номеру пары —
+        # сортируем только даты, где порядок реально нарушен
+        for d in unsorted_dates:
+            by_date[d].sort(key=attrgetter("pair"))
+
+        # обычный dict наружу: без авто-вставки ключей при чтении
+        self.by_date = dict(by_date)
+        # дни только самоподготовки (все дисциплины пусты) — считаем один раз
+        self._self_study_days = {
+            d for d, rows in by_date.items() if all(not r.discipline for r in rows)
+        }
+        # отсортированный список учебных дат — поиск следующего дня через bisect
+        self._sorted_study_dates = sorted(by_date)
+        self._formatted_cache = {}
+        self._mtime_ns = mtime_ns
+        logger.info("Загружено расписание: %d дат из %s", len(by_date), self.csv_file)
+
+    async def reload(self) -> None:
+        # перечитываем CSV в worker-треде; load_csv подменяет by_date
+        # одним присваиванием, так что читатели не видят полусобранный индекс
+        await asyncio.to_thread(self.load_csv)
+
+    def _maybe_reload(self) -> None:
+        """Горячая перезагрузка: перечитываем CSV, если файл изменился.
+
+        Один stat-сисколл на запрос; сами методы синхронны и выполняются
+        на треде event loop без await, так что отдельный лок не нужен.
+        """
+        try:
+            mtime_ns = os.stat(self.csv_file).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns != self._mtime_ns:
+            try:
+                self.load_csv()
+            except Exception:
+                logger.exception("Ошибка перезагрузки %s", self.csv_file)
+                # работаем со старым индексом и не ретраим на каждый запрос
+                self._mtime_ns = mtime_ns
 
     def get_rows_for_date(self, dt: datetime) -> List[LessonRow]:
-        return self.by_date.get(format_date_ddmmyyyy(dt), [])
+        self._maybe_reload()
+        key = dt.date() if isinstance(dt, datetime) else dt
+        return self.by_date.get(key, [])
 
     def has_study_on_date(self, dt: datetime) -> bool:
-        return len(self.get_rows_for_date(dt)) > 0
+        self._maybe_reload()
+        key = dt.date() if isinstance(dt, datetime) else dt
+        return key in self.by_date
 
-    def format_timetable(self, dt: datetime) -> str:
+    def is_self_study_day(self, dt: datetime) -> bool:
+        key = dt.date() if isinstance(dt, datetime) else dt
+        return key in self._self_study_days
+
+    def format_timetable(self, dt: datetime, rows: Optional[List[LessonRow]] = None) -> str:
+        # до проверки кэша: при изменении CSV кэш рендера сбрасывается
+        self._maybe_reload()
         date_str = format_date_ddmmyyyy(dt)
-        rows = self.get_rows_for_date(dt)
+
+        # CSV неизменен между перезагрузками — рендерим каждую дату один раз
+        cached = self._formatted_cache.get(date_str)
+        if cached is not None:
+            return cached
+
+        if rows is None:
+            # напрямую из индекса: _maybe_reload выше уже отработал
+            rows = self.by_date.get(dt.date() if isinstance(dt, datetime) else dt, [])
 
         if not rows:
-            return f"📚 Расписание на {date_str}:\n\nПар нет."
+            msg = f"📚 Расписание на {date_str}:\n\nПар нет."
+            self._formatted_cache[date_str] = msg
+            return msg
 
         # Определяем день недели
         weekdays = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']
@@ -165,41 +301,23 @@ class Timetable:
         lines: List[str] = [f"📚 Расписание на {date_str} ({weekday})\n"]
 
         for r in rows:
-            subject = r.discipline.strip() if r.discipline else ""
-            theme = r.theme.strip() if r.theme else ""
-            kind = r.kind.strip() if r.kind else ""
-            teachers = r.teachers.strip() if r.teachers else ""
-            room = r.room.strip() if r.room else ""
-
-            # Формируем красивую запись для пары
-            pair_lines = [f"🔹 Пара {r.pair}"]
-
-            if subject:
-                pair_lines.append(f"   📖 {subject}")
-                if theme:
-                    pair_lines.append(f"   📝 Тема: {theme}")
-            else:
-                pair_lines.append(f"   📖 —")
-
-            if kind:
-                kind_emoji = {
-                    'л': '👨‍🏫 Лекция',
-                    'пр': '✍️ Практика',
-                    'сем': '💬 Семинар',
-                    'лаб': '🔬 Лабораторная'
-                }.get(kind.lower(), f'📌 {kind}')
-                pair_lines.append(f"   {kind_emoji}")
-
-            if teachers:
-                pair_lines.append(f"   👤 {teachers}")
-
-            if room:
-                pair_lines.append(f"   🚪 Ауд. {room}")
+            # поля уже stripped при загрузке CSV; собираем запись одной f-строкой
+            subject_part = f"\n   📖 {r.discipline}" if r.discipline else "\n   📖 —"
+            theme_part = f"\n   📝 Тема: {r.theme}" if r.discipline and r.theme else ""
+            kind_part = (
+                f"\n   {KIND_EMOJI.get(r.kind.lower(), f'📌 {r.kind}')}" if r.kind else ""
+            )
+            teachers_part = f"\n   👤 {r.teachers}" if r.teachers else ""
+            room_part = f"\n   🚪 Ауд. {r.room}" if r.room else ""
 
-            lines.append("\n".join(pair_lines))
+            lines.append(
+                f"🔹 Пара {r.pair}{subject_part}{theme_part}{kind_part}{teachers_part}{room_part}"
+            )
             lines.append("")  # Пустая строка между парами
 
-        return "\n".join(lines).rstrip()
+        msg = "\n".join(lines).rstrip()
+        self._formatted_cache[date_str] = msg
+        return msg
 
     def get_next_study_day(self, from_dt: Optional[datetime] = None) -> Optional[datetime]:
         """
@@ -210,25 +328,30 @@ class Timetable:
         if from_dt is None:
             from_dt = now_tz()
 
-        start = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        for i in range(1, MAX_LOOKAHEAD_DAYS + 1):
-            d = start + timedelta(days=i)
+        self._maybe_reload()
 
-            if not is_working_day(d):
-                continue
+        start = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
 
-            if NEXT_DAY_MODE_USE_CSV:
-                if self.has_study_on_date(d):
-                    return d
-            else:
-                return d
+        if not NEXT_DAY_MODE_USE_CSV:
+            # следующий будний день считается арифметикой: пт/сб -> пн, иначе +1
+            shift = {4: 3, 5: 2}.get(start.weekday(), 1)
+            return start + timedelta(days=shift)
+
+        # bisect по заранее отсортированным учебным датам вместо перебора дней
+        target = start.date() + timedelta(days=1)
+        limit = start.date() + timedelta(days=MAX_LOOKAHEAD_DAYS)
+        idx = bisect_left(self._sorted_study_dates, target)
+        for d in self._sorted_study_dates[idx:]:
+            if d > limit:
+                break
+            if d.weekday() < 5:
+                return datetime.combine(d, dtime(0, 0), tzinfo=start.tzinfo)
 
         return None
 
 
 # ========= НАПОМИНАНИЯ =========
-@dataclass
+@dataclass(slots=True)
 class UserReminders:
     username: str  # без @
     items: List[str]
@@ -245,20 +368,47 @@ class ReminderStorage:
         "67890": {"username": "maria", "items": ["text1"]}
       }
     }
+
+    Мутации пишутся в журнал (reminders.json.log, одна JSON-строка на операцию):
+    O(размер операции) байт на мутацию вместо перезаписи всего файла.
+    Снапшот переписывается только при компактизации (порог по журналу,
+    ежедневное оглашение, завершение работы), после чего журнал усекается.
     """
 
+    # период фонового сброса на диск, сек
+    FLUSH_INTERVAL = 1.0
+    # компактизация: сколько операций журнала накапливаем до снапшота
+    COMPACT_THRESHOLD = 200
+
     def __init__(self, storage_file: str):
         self.storage_file = storage_file
+        self.journal_file = storage_file + ".log"
         self.users: Dict[int, UserReminders] = {}
+        # растёт при каждой мутации — дешёвый ключ для кэшей поверх хранилища
+        self.state_version = 0
+        self._dirty = False
+        self._journal_len = 0
+        self._flush_task: Optional[asyncio.Task] = None
         self.load()
 
     def load(self) -> None:
+        self._load_snapshot()
+        self._replay_journal()
+
+    def _load_snapshot(self) -> None:
         if not os.path.exists(self.storage_file):
             self.users = {}
             return
 
-        with open(self.storage_file, "r", encoding="utf-8") as f:
-            raw = json.load(f) or {}
+        try:
+            with open(self.storage_file, "rb") as f:
+                data = f.read()
+            raw = (orjson.loads(data) if orjson is not None else json.loads(data)) or {}
+        except Exception:
+            # битый файл не должен ронять бота: стартуем с пустым состоянием
+            logger.exception("Ошибка чтения %s, напоминания сброшены", self.storage_file)
+            self.users = {}
+            return
 
         users_raw = raw.get("users", {}) or {}
         users: Dict[int, UserReminders] = {}
@@ -277,15 +427,138 @@ class ReminderStorage:
 
         self.users = users
 
+    def _replay_journal(self) -> None:
+        if not os.path.exists(self.journal_file):
+            return
+
+        try:
+            with open(self.journal_file, "rb") as f:
+                lines = [ln for ln in f.read().splitlines() if ln.strip()]
+        except Exception:
+            logger.exception("Ошибка чтения журнала %s", self.journal_file)
+            return
+
+        for ln in lines:
+            try:
+                op = orjson.loads(ln) if orjson is not None else json.loads(ln)
+                self._apply_op(op)
+            except Exception:
+                logger.exception("Пропущена битая запись журнала")
+
+        self._journal_len = len(lines)
+        if lines:
+            # снапшот отстаёт от журнала — скомпактируем при первой возможности
+            self._dirty = True
+
+    def _apply_op(self, op: Dict[str, Any]) -> None:
+        kind = op.get("op")
+        if kind == "add":
+            uid = int(op["uid"])
+            username = (op.get("username") or "").strip()
+            ur = self.users.get(uid)
+            if ur is None:
+                self.users[uid] = UserReminders(username=username, items=[op["text"]])
+            else:
+                if username and username != ur.username:
+                    ur.username = username
+                ur.items.append(op["text"])
+        elif kind == "del_one":
+            uid = int(op["uid"])
+            idx = int(op["index"]) - 1
+            ur = self.users.get(uid)
+            if ur and 0 <= idx < len(ur.items):
+                ur.items.pop(idx)
+                if not ur.items:
+                    self.users.pop(uid, None)
+        elif kind == "del_all":
+            self.users.pop(int(op["uid"]), None)
+        elif kind == "clear":
+            self.users = {}
+
+    def _log(self, op: Dict[str, Any]) -> None:
+        # _log вызывается ровно раз на мутацию — удобная точка для версии
+        self.state_version += 1
+        # O(1) запись мутации: дописываем одну JSON-строку в журнал
+        line = (
+            orjson.dumps(op)
+            if orjson is not None
+            else json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        try:
+            with open(self.journal_file, "ab") as f:
+                f.write(line + b"\n")
+        except Exception:
+            logger.exception("Ошибка записи журнала %s", self.journal_file)
+            self._dirty = True  # журнал недоступен — полагаемся на снапшот
+            return
+
+        self._journal_len += 1
+        if self._journal_len >= self.COMPACT_THRESHOLD:
+            self.save()
+
     def save(self) -> None:
-        raw = {
-            "users": {
-                str(uid): {"username": ur.username, "items": ur.items}
-                for uid, ur in self.users.items()
-            }
-        }
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(raw, f, ensure_ascii=False, indent=2)
+        # помечает состояние для компактизации (снапшот + усечение журнала);
+        # на диск пишет фоновая задача (или flush_now при завершении)
+        self._dirty = True
+
+    def flush_now(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._save_sync()
+
+    async def save_async(self) -> None:
+        # немедленная запись без блокировки event loop (для async-обработчиков)
+        if self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(self._save_sync)
+
+    def start_flush_task(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            if self._dirty:
+                self._dirty = False
+                try:
+                    await asyncio.to_thread(self._save_sync)
+                except Exception:
+                    logger.exception("Ошибка записи %s", self.storage_file)
+                    self._dirty = True  # попробуем на следующем цикле
+
+    def _save_sync(self) -> None:
+        # пишем во временный файл + os.replace: атомарно, файл не бьётся при крэше;
+        # без промежуточного {"users": {...}}-словаря — не удваиваем пик памяти
+        tmp = self.storage_file + ".tmp"
+        if orjson is not None:
+            # orjson сериализует dataclass'ы напрямую
+            payload = orjson.dumps({"users": self.users}, option=orjson.OPT_NON_STR_KEYS)
+            with open(tmp, "wb") as f:
+                f.write(payload)
+                if REMINDERS_FSYNC:
+                    f.flush()
+                    os.fsync(f.fileno())
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write('{"users":{')
+                f.write(",".join(
+                    f'"{uid}":' + json.dumps(
+                        {"username": ur.username, "items": ur.items},
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    )
+                    for uid, ur in self.users.items()
+                ))
+                f.write("}}")
+                if REMINDERS_FSYNC:
+                    f.flush()
+                    os.fsync(f.fileno())
+        os.replace(tmp, self.storage_file)
+
+        # снапшот актуален — журнал операций можно усечь
+        open(self.journal_file, "wb").close()
+        self._journal_len = 0
 
     def add(self, user_id: int, username: str, text: str) -> int:
         text = normalize_text(text)
@@ -299,15 +572,15 @@ class ReminderStorage:
             ur = UserReminders(username=username, items=[])
             self.users[user_id] = ur
         else:
-            # обновим username на более актуальный, если появился
-            if username:
+            # обновим username на более актуальный, только если он реально изменился
+            if username and username != ur.username:
                 ur.username = username
 
         if len(ur.items) >= MAX_REMINDERS_PER_USER:
             return -1
 
         ur.items.append(text)
-        self.save()
+        self._log({"op": "add", "uid": user_id, "username": ur.username, "text": text})
         return len(ur.items)
 
     def get_user_items(self, user_id: int) -> List[str]:
@@ -324,25 +597,34 @@ class ReminderStorage:
         ur.items.pop(idx)
         if not ur.items:
             self.users.pop(user_id, None)
-        self.save()
+        self._log({"op": "del_one", "uid": user_id, "index": index_1based})
         return True
 
     def delete_all(self, user_id: int) -> bool:
         if user_id not in self.users:
             return False
         self.users.pop(user_id, None)
-        self.save()
+        self._log({"op": "del_all", "uid": user_id})
         return True
 
     def clear_all_users(self) -> None:
+        if not self.users:
+            # нечего чистить — не пишем ни журнал, ни снапшот
+            return
         self.users = {}
+        self._log({"op": "clear"})
+        # ежедневное оглашение — естественная точка компактизации
         self.save()
 
     def all_users(self) -> Dict[int, UserReminders]:
         return self.users
 
 
-def format_reminders_block(users: Dict[int, UserReminders]) -> str:
+# (version, block): блок пересобирается только после мутаций хранилища
+_reminders_block_cache: tuple = (-1, "")
+
+
+def format_reminders_block(storage: "ReminderStorage") -> str:
     """
     Формат:
     @ivan:
@@ -352,41 +634,58 @@ def format_reminders_block(users: Dict[int, UserReminders]) -> str:
     @maria:
     "..."
     """
+    global _reminders_block_cache
+
+    users = storage.all_users()
     if not users:
         return ""
 
+    version, cached = _reminders_block_cache
+    if version == storage.state_version:
+        return cached
+
     parts: List[str] = []
-    for _, ur in users.items():
+    for ur in users.values():
         uname = ur.username or "username"
         parts.append(f"@{uname}:")
         if len(ur.items) == 1:
             parts.append(f"\"{ur.items[0]}\"")
         else:
-            for i, text in enumerate(ur.items, 1):
-                parts.append(f"{i}. \"{text}\"")
+            parts.extend(f"{i}. \"{text}\"" for i, text in enumerate(ur.items, 1))
         parts.append("")  # пустая строка между пользователями
-    return "\n".join(parts).rstrip()
+
+    block = "\n".join(parts).rstrip()
+    _reminders_block_cache = (storage.state_version, block)
+    return block
 
 
 # ========= БОТ =========
-timetable = Timetable(CSV_FILE)
-reminders = ReminderStorage(REMINDERS_FILE)
+# создаются в main(): файлы грузятся параллельно, а не при импорте модуля
+timetable: Timetable
+reminders: ReminderStorage
 
-BTN_TIMETABLE = "📅 Расписание"
-BTN_MY_REMINDERS = "⏰ Мои напоминания"
-BTN_ADD_REMINDER = "➕ Добавить напоминание"
-BTN_DEL_REMINDER = "🗑️ Удалить напоминание"
+# intern: лукап в BUTTON_DISPATCH чаще срезается по сравнению указателей
+BTN_TIMETABLE = sys.intern("📅 Расписание")
+BTN_MY_REMINDERS = sys.intern("⏰ Мои напоминания")
+BTN_ADD_REMINDER = sys.intern("➕ Добавить напоминание")
+BTN_DEL_REMINDER = sys.intern("🗑️ Удалить напоминание")
 
 CB_DEL_ONE_PREFIX = "del_one:"
 CB_DEL_ALL = "del_all"
 
 
-def main_keyboard() -> ReplyKeyboardMarkup:
-    keyboard = [
+# клавиатура неизменна — собираем один раз при импорте
+MAIN_KEYBOARD = ReplyKeyboardMarkup(
+    [
         [BTN_TIMETABLE, BTN_MY_REMINDERS],
         [BTN_ADD_REMINDER, BTN_DEL_REMINDER],
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    ],
+    resize_keyboard=True,
+)
+
+
+def main_keyboard() -> ReplyKeyboardMarkup:
+    return MAIN_KEYBOARD
 
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -394,7 +693,7 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.effective_message.reply_text(
         "Меню бота готово.\n\n"
         f"Chat ID (для конфига): {chat_id}",
-        reply_markup=main_keyboard(),
+        reply_markup=MAIN_KEYBOARD,
     )
 
 
@@ -403,14 +702,16 @@ async def cmd_get_timetable(update: Update, context: ContextTypes.DEFAULT_TYPE)
     args = context.args or []
     if args:
         ds = args[0].strip()
-        if not DATE_RE.match(ds):
+        # parse_date_ddmmyyyy сам валидирует (и формат, и 31.02 и т.п.)
+        try:
+            dt = parse_date_ddmmyyyy(ds)
+        except ValueError:
             await update.effective_message.reply_text(
                 "❌ Неверный формат даты. Используй: /get_timetable 01.02.2026"
             )
             return
-        dt = parse_date_ddmmyyyy(ds)
         # делаем дату в нашей TZ (только дата важна)
-        dt = TIMEZONE.localize(dt)
+        dt = dt.replace(tzinfo=TIMEZONE)
         msg = timetable.format_timetable(dt)
         await update.effective_message.reply_text(msg)
         return
@@ -424,17 +725,8 @@ async def cmd_get_timetable(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.effective_message.reply_text(msg)
 
 
-async def cmd_set_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    # /set_reminder "text"
-    text = " ".join(context.args or [])
-    text = text.strip().strip("\"").strip("'").strip()
-
-    if not text:
-        await update.effective_message.reply_text(
-            "❌ Использование: /set_reminder \"Текст напоминания\""
-        )
-        return
-
+async def _add_reminder_and_reply(update: Update, text: str) -> None:
+    """Общий путь добавления напоминания: лимиты + ответ пользователю."""
     if len(text) > 500:
         await update.effective_message.reply_text("❌ Слишком длинно (макс 500 символов).")
         return
@@ -454,6 +746,20 @@ async def cmd_set_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     )
 
 
+async def cmd_set_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    # /set_reminder "text"
+    text = " ".join(context.args or [])
+    text = text.strip().strip("\"").strip("'").strip()
+
+    if not text:
+        await update.effective_message.reply_text(
+            "❌ Использование: /set_reminder \"Текст напоминания\""
+        )
+        return
+
+    await _add_reminder_and_reply(update, text)
+
+
 async def show_my_reminders(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     items = reminders.get_user_items(user.id)
@@ -480,44 +786,21 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     # Ниже код работает только в приватных чатах
     text = (update.effective_message.text or "").strip()
 
-    # кнопки
-    if text == BTN_TIMETABLE:
-        await cmd_get_timetable(update, context)
-        return
-    if text == BTN_MY_REMINDERS:
-        await show_my_reminders(update, context)
-        return
-    if text == BTN_ADD_REMINDER:
-        await ask_add_reminder(update, context)
-        return
-    if text == BTN_DEL_REMINDER:
-        await show_delete_menu(update, context)
+    # кнопки: один hash-lookup вместо цепочки сравнений строк
+    handler = BUTTON_DISPATCH.get(text)
+    if handler is not None:
+        await handler(update, context)
         return
 
     # ожидаем ввод напоминания
     if context.user_data.get("waiting_for_reminder_text"):
         context.user_data["waiting_for_reminder_text"] = False
-        user = update.effective_user
         reminder_text = normalize_text(text)
         if not reminder_text:
             await update.effective_message.reply_text("❌ Пустое напоминание не добавлено.")
             return
-        if len(reminder_text) > 500:
-            await update.effective_message.reply_text("❌ Слишком длинно (макс 500 символов).")
-            return
 
-        username = (user.username or user.first_name or "user").strip()
-        count = reminders.add(user.id, username=username, text=reminder_text)
-
-        if count == -1:
-            await update.effective_message.reply_text(
-                f"❌ Достигнут лимит напоминаний ({MAX_REMINDERS_PER_USER})."
-            )
-            return
-
-        await update.effective_message.reply_text(
-            f"✅ Добавлено. Сейчас у тебя {count} напоминаний(я) до ближайшего оглашения."
-        )
+        await _add_reminder_and_reply(update, reminder_text)
         return
 
     # fallback - только в приватном чате
@@ -548,6 +831,15 @@ async def show_delete_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     )
 
 
+# кнопки меню -> обработчики (заполняется после определения функций)
+BUTTON_DISPATCH = {
+    BTN_TIMETABLE: cmd_get_timetable,
+    BTN_MY_REMINDERS: show_my_reminders,
+    BTN_ADD_REMINDER: ask_add_reminder,
+    BTN_DEL_REMINDER: show_delete_menu,
+}
+
+
 async def on_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     q = update.callback_query
     if not q:
@@ -575,6 +867,24 @@ async def on_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
 
 # ========= АВТОУВЕДОМЛЕНИЯ =========
+async def _send_limited(bot, sem: asyncio.Semaphore, chat_id: int, text: str) -> None:
+    async with sem:
+        await bot.send_message(chat_id=chat_id, text=text)
+
+
+async def broadcast_message(bot, text: str) -> None:
+    """Отправка во все CHAT_IDS параллельно (лимит Telegram ~30 msg/s)."""
+    if len(CHAT_IDS) == 1:
+        await bot.send_message(chat_id=CHAT_IDS[0], text=text)
+        return
+
+    sem = asyncio.Semaphore(30)
+    await asyncio.gather(
+        *(_send_limited(bot, sem, cid, text) for cid in CHAT_IDS),
+        return_exceptions=True,
+    )
+
+
 async def send_schedule_to_chat(target_date: datetime, *, label: str, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     label: строка для логов/отладки, например 'morning'/'evening'
@@ -582,20 +892,24 @@ async def send_schedule_to_chat(target_date: datetime, *, label: str, context: C
     if not is_working_day(target_date):
         return
 
-    if not timetable.has_study_on_date(target_date):
+    # один лукап: полученные строки передаём рендеру вместо повторного поиска
+    rows = timetable.get_rows_for_date(target_date)
+    if not rows:
         return
 
-    msg = timetable.format_timetable(target_date)
+    msg = timetable.format_timetable(target_date, rows)
 
     # приклеиваем "следующие напоминания" и очищаем их (т.к. они "к следующему уведомлению")
     all_users = reminders.all_users()
     if all_users:
-        block = format_reminders_block(all_users)
+        block = format_reminders_block(reminders)
         if block:
             msg = msg + "\n\n" + block
         reminders.clear_all_users()
+        # оглашение — естественная точка фиксации: не ждём фоновый flush
+        await reminders.save_async()
 
-    await context.bot.send_message(chat_id=CHAT_ID, text=msg)
+    await broadcast_message(context.bot, msg)
 
 
 async def job_morning(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -627,8 +941,53 @@ def schedule_jobs(application: Application) -> None:
 
 
 # ========= MAIN =========
+async def _on_startup(application: Application) -> None:
+    reminders.start_flush_task()
+
+
+async def _on_shutdown(application: Application) -> None:
+    # гарантируем запись несброшенных напоминаний до остановки loop
+    await reminders.save_async()
+
+
+def _setup_logging() -> None:
+    # запись логов через очередь: форматирование/вывод идут в фоновом
+    # треде QueueListener и не блокируют event loop
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, stream)
+    listener.start()
+    atexit.register(listener.stop)
+
+
 def main() -> None:
-    application = Application.builder().token(TOKEN).build()
+    global timetable, reminders
+
+    _setup_logging()
+
+    # параллельная загрузка: старт ограничен максимальным, а не суммарным файлом
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        f_timetable = pool.submit(Timetable, CSV_FILE)
+        f_reminders = pool.submit(ReminderStorage, REMINDERS_FILE)
+        timetable = f_timetable.result()
+        reminders = f_reminders.result()
+
+    # последний шанс сохранить несброшенные напоминания при завершении
+    atexit.register(reminders.flush_now)
+
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .post_init(_on_startup)
+        .post_shutdown(_on_shutdown)
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", cmd_start))
     application.add_handler(CommandHandler("get_timetable", cmd_get_timetable))
@@ -638,7 +997,22 @@ def main() -> None:
 
     schedule_jobs(application)
 
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if WEBHOOK_URL:
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=TOKEN,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{TOKEN}",
+            allowed_updates=Update.ALL_TYPES,
+        )
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:  # необязательная зависимость
+        pass
     main()